@@ -1,19 +1,58 @@
 # ain_resolver.py
-import requests
+import asyncio
+import os
 
-def resolve_address_to_ain(house_number: str, street_name: str) -> str:
+import diskcache
+import orjson
+
+from http_client import get_client
+
+# Socrata resource endpoint: filters server-side via SoQL
+ADDRESS_RESOURCE_URL = "https://data.lacity.org/resource/3r7r-b5nq.json"
+
+# Address -> AIN hits survive restarts; AINs for an address rarely change
+CACHE_DIR = os.environ.get("LAROCI_AIN_CACHE_DIR", ".ain_cache")
+CACHE_EXPIRE_SECONDS = 30 * 86400
+_cache = None
+
+def _get_cache() -> diskcache.FanoutCache:
+    global _cache
+    if _cache is None:
+        _cache = diskcache.FanoutCache(CACHE_DIR, shards=8, size_limit=200 * 1024 * 1024)
+    return _cache
+
+def _cache_get(key: str):
+    return _get_cache().get(key)
+
+def _cache_set(key: str, ain: str) -> None:
+    _get_cache().set(key, ain, expire=CACHE_EXPIRE_SECONDS)
+
+def _soql_str(value: str) -> str:
+    return value.replace("'", "''")
+
+async def resolve_address_to_ain(house_number: str, street_name: str) -> str:
     """Use LA City Open Data to resolve address → AIN"""
-    url = "https://data.lacity.org/api/views/3r7r-b5nq/rows.json"
+    key = f"{house_number.strip().lower()}|{' '.join(street_name.lower().split())}"
+    # diskcache is SQLite file I/O (opening included): keep it off the event loop
+    ain = await asyncio.to_thread(_cache_get, key)
+    if ain is not None:
+        return ain
+
+    house = _soql_str(house_number.strip())
+    street = _soql_str(street_name.strip().upper())
     params = {
-        "house_number": house_number,
-        "street_name": street_name.replace(" ", "%20")
+        "$select": "ain",
+        "$where": f"house_number='{house}' AND upper(street_name) like '{street}%'",
+        "$limit": 1,
     }
     try:
-        resp = requests.get(url, params=params, timeout=10)
-        data = resp.json()
-        for row in data.get("rows", []):
-            if row.get("house_number") == house_number and row.get("street_name", "").upper().startswith(street_name.upper()):
-                return row.get("ain")
+        resp = await get_client().get(ADDRESS_RESOURCE_URL, params=params, timeout=10)
+        rows = orjson.loads(resp.content)
+        if rows:
+            ain = rows[0].get("ain")
     except:
         pass
-    return None
+
+    if ain:
+        await asyncio.to_thread(_cache_set, key, ain)
+    return ain
@@ -0,0 +1,26 @@
+# background_loop.py
+# Description: One asyncio loop per process, run in a daemon thread, for sync
+#              callers (the Streamlit app) that drive the async scrapers.
+
+import asyncio
+import threading
+from typing import Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the process-wide background loop, starting it on first use.
+
+    Kept at module level rather than in st.cache_resource: the shared httpx
+    client and the alru caches bind to this loop, so "Clear cache" must not
+    replace it.
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True, name="laroci-loop").start()
+    return _loop
@@ -0,0 +1,31 @@
+# http_client.py
+from typing import Optional
+
+import httpx
+
+# Shared async client so Assessor + ArcGIS hosts reuse keep-alive sockets
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide httpx.AsyncClient, creating it on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            timeout=10,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """
+    Close the shared client (FastAPI lifespan shutdown / end of a CLI run).
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
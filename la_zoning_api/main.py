@@ -1,16 +1,35 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-import requests
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import httpx
 
 import scraper_zoning
 import scraper_pdb
+from http_client import get_client, close_client
+
+# Max AINs fetched in flight at once by /combo/batch
+COMBO_CONCURRENCY = int(os.environ.get("LA_COMBO_CONCURRENCY", "32"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared HTTP pool on startup, close it on shutdown
+    get_client()
+    yield
+    await close_client()
 
 
 app = FastAPI(
     title="LA Parcel & Zoning API",
     description="FastAPI wrapper around Assessor PDB + Z-NET zoning scrapers.",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # ---------- Pydantic models ----------
@@ -63,15 +82,28 @@ def health():
     return {"status": "ok"}
 
 
-@app.get("/parcel/{ain}", response_model=ParcelSummary)
-def get_parcel_summary(ain: str):
+@app.post("/cache/clear")
+async def clear_cache():
+    """
+    Drop cached Assessor records and Z-NET lookups.
+    Async so it runs on the event loop: the alru caches are not thread-safe.
+    """
+    scraper_pdb.fetch_parcel_detail.cache_clear()
+    scraper_zoning._fetch_zoning_cached.cache_clear()
+    return {"status": "cleared"}
+
+
+# Summaries come from our own builders, so skip per-response validation
+# (response_model=None) and keep the schemas for the OpenAPI docs only.
+@app.get("/parcel/{ain}", response_model=None, responses={200: {"model": ParcelSummary}})
+async def get_parcel_summary(ain: str):
     """
     Returns the PDB / assessor summary (build_summary from scraper_pdb).
     """
     try:
-        raw = scraper_pdb.fetch_parcel_detail(ain)
+        raw = await scraper_pdb.fetch_parcel_detail(ain)
         summary = scraper_pdb.build_summary(raw)
-    except requests.HTTPError as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Assessor API error: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -81,14 +113,14 @@ def get_parcel_summary(ain: str):
     return summary
 
 
-@app.get("/zoning/{ain}", response_model=ZoningSummary)
-def get_zoning_summary(ain: str):
+@app.get("/zoning/{ain}", response_model=None, responses={200: {"model": ZoningSummary}})
+async def get_zoning_summary(ain: str):
     """
     Returns assessor + Z-NET zoning info (fetch_zoning_by_ain from scraper_zoning).
     """
     try:
-        data = scraper_zoning.fetch_zoning_by_ain(ain)
-    except requests.HTTPError as e:
+        data = await scraper_zoning.fetch_zoning_by_ain(ain)
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"HTTP error: {e}")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -100,43 +132,109 @@ def get_zoning_summary(ain: str):
     return data
 
 
-@app.get("/combo/{ain}", response_model=CombinedResponse)
-def get_combined(ain: str):
+async def _combo(ain: str) -> Dict[str, Any]:
     """
-    Full combined view: PDB summary + Z-NET zoning in one call.
+    Fetch the Assessor record once, then build the PDB summary while the
+    Z-NET query (which only needs lat/lon from that record) is in flight.
     """
-    parcel = get_parcel_summary(ain)
-    zoning = get_zoning_summary(ain)
+    try:
+        raw = await scraper_pdb.fetch_parcel_detail(ain)
+        summary, zoning = await asyncio.gather(
+            asyncio.to_thread(scraper_pdb.build_summary, raw),
+            scraper_zoning.fetch_zoning_by_ain(ain, parcel=raw.get("Parcel", {})),
+        )
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"HTTP error: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not summary:
+        raise HTTPException(status_code=404, detail="No parcel data found for this AIN.")
+    if not zoning:
+        raise HTTPException(status_code=404, detail="No zoning data found for this AIN.")
 
     return {
         "ain": ain,
-        "parcel": parcel,
+        "parcel": summary,
         "zoning": zoning,
     }
 
 
-@app.post("/combo/batch")
-def combo_batch(request: BatchRequest) -> Dict[str, Any]:
+@app.get("/combo/{ain}", response_model=None, responses={200: {"model": CombinedResponse}})
+async def get_combined(ain: str):
+    """
+    Full combined view: PDB summary + Z-NET zoning in one call.
+    """
+    return await _combo(ain)
+
+
+async def _fan_out(ains: List[str], fetch: Callable[[str], Awaitable[Any]]) -> List[Any]:
+    """
+    Run fetch(ain) for every AIN, at most COMBO_CONCURRENCY in flight.
+    Exceptions are returned in place of results.
+    """
+    sem = asyncio.Semaphore(COMBO_CONCURRENCY)
+
+    async def one(ain: str) -> Any:
+        async with sem:
+            return await fetch(ain)
+
+    return await asyncio.gather(*(one(ain) for ain in ains), return_exceptions=True)
+
+
+@app.post("/combo/batch", response_model=None)
+async def combo_batch(request: BatchRequest) -> Dict[str, Any]:
     """
     Batch combined view: send multiple AINs and get parcel+zoning for each.
     Returns a list of results; if one fails, we include an error field.
     """
+    outcomes = await _fan_out(request.ains, _combo)
+
     results = []
-    for ain in request.ains:
-        try:
-            parcel = get_parcel_summary(ain)
-            zoning = get_zoning_summary(ain)
-            results.append({
-                "ain": ain,
-                "parcel": parcel,
-                "zoning": zoning,
-            })
-        except Exception as e:
+    for ain, outcome in zip(request.ains, outcomes):
+        if isinstance(outcome, Exception):
             results.append({
                 "ain": ain,
                 "parcel": None,
                 "zoning": None,
-                "error": str(e),
+                "error": str(outcome),
             })
+        else:
+            results.append(outcome)
 
     return {"results": results}
+
+
+async def _batch_by_ain(ains: List[str], fetch: Callable[[str], Awaitable[Any]]) -> Dict[str, Any]:
+    unique = list(dict.fromkeys(a.strip() for a in ains if a.strip()))
+    outcomes = await _fan_out(unique, fetch)
+    return {
+        ain: {"error": str(outcome)} if isinstance(outcome, Exception) else outcome
+        for ain, outcome in zip(unique, outcomes)
+    }
+
+
+@app.post("/parcel/batch", response_model=None)
+async def parcel_batch(request: BatchRequest) -> Dict[str, Any]:
+    """
+    Batch PDB summaries, keyed by AIN. Duplicate AINs are fetched once;
+    failures come back as {"error": ...} under their AIN.
+    """
+    return await _batch_by_ain(request.ains, get_parcel_summary)
+
+
+@app.post("/zoning/batch", response_model=None)
+async def zoning_batch(request: BatchRequest) -> Dict[str, Any]:
+    """
+    Batch Z-NET zoning, keyed by AIN. Duplicate AINs are fetched once;
+    failures come back as {"error": ...} under their AIN.
+    """
+    return await _batch_by_ain(request.ains, get_zoning_summary)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -1,24 +1,69 @@
 import sys
 import json
-import requests
+import asyncio
+from collections import OrderedDict
+from typing import Tuple
+
+import orjson
+from async_lru import alru_cache
+
+from http_client import get_client, close_client
 
 BASE_URL = "https://portal.assessor.lacounty.gov"
 
+# Parcel records change rarely; keep them for an hour
+CACHE_TTL_SECONDS = 3600
+
+# ETag revalidation: ain -> (etag, parsed body), so a TTL refresh that gets a
+# 304 skips the download and parse. Switched off if the host sends no ETag.
+ETAG_CACHE_SIZE = 10_000
+_etags: "OrderedDict[str, Tuple[str, dict]]" = OrderedDict()
+_etag_supported = True
+
 
 # -------------------------------
 # Fetch raw API JSON
 # -------------------------------
-def fetch_parcel_detail(ain: str) -> dict:
+@alru_cache(maxsize=10_000, ttl=CACHE_TTL_SECONDS)
+async def fetch_parcel_detail(ain: str) -> dict:
+    global _etag_supported
     url = f"{BASE_URL}/api/parceldetail"
     params = {"ain": ain}
-    r = requests.get(url, params=params)
+
+    prev = _etags.get(ain) if _etag_supported else None
+    headers = {"If-None-Match": prev[0]} if prev else None
+    r = await get_client().get(url, params=params, headers=headers)
+    if r.status_code == 304 and prev:
+        _etags.move_to_end(ain)
+        return prev[1]
     r.raise_for_status()
-    return r.json()
+    data = orjson.loads(r.content)
+
+    etag = r.headers.get("ETag")
+    if not etag:
+        _etag_supported = False
+        _etags.clear()
+    elif _etag_supported:
+        _etags[ain] = (etag, data)
+        _etags.move_to_end(ain)
+        if len(_etags) > ETAG_CACHE_SIZE:
+            _etags.popitem(last=False)
+    return data
 
 
 # -------------------------------
 # Build the PDB summary you need
 # -------------------------------
+def _to_int(value) -> int:
+    # Assessor sends counts as ints or (possibly blank) strings
+    if type(value) is int:
+        return value
+    try:
+        return int(str(value).strip() or "0")
+    except ValueError:
+        return 0
+
+
 def build_summary(raw: dict) -> dict:
     p = raw.get("Parcel", {})
     subparts = p.get("SubParts", []) or []
@@ -45,11 +90,7 @@ def build_summary(raw: dict) -> dict:
 
     for sp in subparts:
         # SqFt
-        try:
-            sqft = int(str(sp.get("SqftMain", "0")).strip() or "0")
-        except ValueError:
-            sqft = 0
-        total_sqft_pdb += sqft
+        total_sqft_pdb += _to_int(sp.get("SqftMain", "0"))
 
         # Year built
         yb = (sp.get("YearBuilt") or "").strip()
@@ -57,18 +98,9 @@ def build_summary(raw: dict) -> dict:
             year_built_set.add(yb)
 
         # Units / beds / baths
-        try:
-            total_units += int(str(sp.get("NumOfUnits", "0")).strip() or "0")
-        except:
-            pass
-        try:
-            total_beds += int(str(sp.get("NumOfBeds", "0")).strip() or "0")
-        except:
-            pass
-        try:
-            total_baths += int(str(sp.get("NumOfBaths", "0")).strip() or "0")
-        except:
-            pass
+        total_units += _to_int(sp.get("NumOfUnits", "0"))
+        total_beds += _to_int(sp.get("NumOfBeds", "0"))
+        total_baths += _to_int(sp.get("NumOfBaths", "0"))
 
         # Design type dictionary
         design_types.append({
@@ -81,12 +113,13 @@ def build_summary(raw: dict) -> dict:
 
     # Fallbacks if no subparts
     if not subparts:
-        total_sqft_pdb = p.get("SqftMain") or 0
-        total_units = p.get("NumOfUnits") or 0
-        total_beds = p.get("NumOfBeds") or 0
-        total_baths = p.get("NumOfBaths") or 0
-        if p.get("YearBuilt"):
-            year_built_set.add(p.get("YearBuilt"))
+        total_sqft_pdb = _to_int(p.get("SqftMain"))
+        total_units = _to_int(p.get("NumOfUnits"))
+        total_beds = _to_int(p.get("NumOfBeds"))
+        total_baths = _to_int(p.get("NumOfBaths"))
+        yb = str(p.get("YearBuilt") or "").strip()
+        if yb:
+            year_built_set.add(yb)
 
     # Normalize year built
     year_built_list = sorted(list(year_built_set)) if year_built_set else []
@@ -129,13 +162,20 @@ def build_summary(raw: dict) -> dict:
 # -------------------------------
 # Main runner
 # -------------------------------
+async def _fetch_and_close(ain: str) -> dict:
+    try:
+        return await fetch_parcel_detail(ain)
+    finally:
+        await close_client()
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python scraper.py <AIN>")
         sys.exit(1)
 
     ain = sys.argv[1].strip()
-    raw = fetch_parcel_detail(ain)
+    raw = asyncio.run(_fetch_and_close(ain))
 
     print("=== RAW JSON ===")
     print(json.dumps(raw, indent=2))
@@ -1,39 +1,48 @@
 import sys
 import json
-import requests
+import asyncio
 from typing import Optional, Dict, Any
 
-# Assessor parcel API base
-ASSESSOR_BASE_URL = "https://portal.assessor.lacounty.gov"
+import orjson
+from async_lru import alru_cache
+
+from http_client import get_client, close_client
+from scraper_pdb import fetch_parcel_detail
 
 # Z-NET Planning layer (Layer 4: Zoning)
 ZONING_LAYER_URL = (
     "https://arcgis.gis.lacounty.gov/arcgis/rest/services/DRP/ZNET_Public/MapServer/4/query"
 )
 
+# Zoning polygons change rarely; keep them for an hour
+CACHE_TTL_SECONDS = 3600
+
+# ~1 m precision: nearby points on the same parcel share one cache entry
+COORD_PRECISION = 5
+
 
 # -------------------------------
 # 1) Assessor parcel API by AIN
 # -------------------------------
-def fetch_parcel_detail(ain: str) -> Dict[str, Any]:
-    """
-    Fetch parcel detail JSON from LA County Assessor by AIN.
-    """
-    url = f"{ASSESSOR_BASE_URL}/api/parceldetail"
-    params = {"ain": ain}
-    r = requests.get(url, params=params)
-    r.raise_for_status()
-    return r.json()
+# fetch_parcel_detail is imported from scraper_pdb so both paths share one
+# TTL cache and ETag store.
 
 
 # -------------------------------
 # 2) Z-NET zoning by lat/lon
 # -------------------------------
-def fetch_zoning(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+async def fetch_zoning(lat: float, lon: float) -> Optional[Dict[str, Any]]:
     """
     Query Z-NET for zoning using WGS84 coordinates.
     Returns dict with zone, description, category, Title 22 link.
     """
+    return await _fetch_zoning_cached(
+        round(float(lat), COORD_PRECISION), round(float(lon), COORD_PRECISION)
+    )
+
+
+@alru_cache(maxsize=10_000, ttl=CACHE_TTL_SECONDS)
+async def _fetch_zoning_cached(lat: float, lon: float) -> Optional[Dict[str, Any]]:
     params = {
         "f": "json",
         "geometry": f"{lon},{lat}",  # x,y = lon,lat
@@ -42,11 +51,12 @@ def fetch_zoning(lat: float, lon: float) -> Optional[Dict[str, Any]]:
         "spatialRel": "esriSpatialRelIntersects",
         "outFields": "ZONE,Z_DESC,Z_CATEGORY,TITLE_22",
         "returnGeometry": "false",
+        "resultRecordCount": 1,
     }
 
-    r = requests.get(ZONING_LAYER_URL, params=params)
+    r = await get_client().get(ZONING_LAYER_URL, params=params)
     r.raise_for_status()
-    data = r.json()
+    data = orjson.loads(r.content)
 
     features = data.get("features", [])
     if not features:
@@ -65,15 +75,20 @@ def fetch_zoning(lat: float, lon: float) -> Optional[Dict[str, Any]]:
 # -------------------------------
 # 3) Convenience: zoning by AIN
 # -------------------------------
-def fetch_zoning_by_ain(ain: str) -> Dict[str, Any]:
+async def fetch_zoning_by_ain(
+    ain: str, parcel: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     High-level helper:
       AIN -> Assessor API (lat/lon, address, PDB code)
           -> Z-NET zoning
           -> combined summary dict
+
+    Pass an already-fetched Assessor "Parcel" dict to skip the Assessor call.
     """
-    raw = fetch_parcel_detail(ain)
-    parcel = raw.get("Parcel", {})
+    if parcel is None:
+        raw = await fetch_parcel_detail(ain)
+        parcel = raw.get("Parcel", {})
 
     lat = parcel.get("Latitude")
     lon = parcel.get("Longitude")
@@ -88,7 +103,7 @@ def fetch_zoning_by_ain(ain: str) -> Dict[str, Any]:
         [p for p in [situs_street, situs_city, situs_zip] if p]
     )
 
-    zoning_info = fetch_zoning(lat, lon)
+    zoning_info = await fetch_zoning(lat, lon)
 
     result: Dict[str, Any] = {
         "ain": parcel.get("AIN") or ain,
@@ -124,6 +139,13 @@ def fetch_zoning_by_ain(ain: str) -> Dict[str, Any]:
 # -------------------------------
 # 4) CLI entrypoint
 # -------------------------------
+async def _zoning_and_close(ain: str) -> Dict[str, Any]:
+    try:
+        return await fetch_zoning_by_ain(ain)
+    finally:
+        await close_client()
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python scraper_zoning.py <AIN>")
@@ -131,7 +153,7 @@ def main():
         sys.exit(1)
 
     ain = sys.argv[1].strip()
-    data = fetch_zoning_by_ain(ain)
+    data = asyncio.run(_zoning_and_close(ain))
 
     print("=== ZONING BY AIN ===")
     print(json.dumps(data, indent=2))
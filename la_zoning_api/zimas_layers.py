@@ -0,0 +1,166 @@
+# zimas_layers.py
+# Description: Answers ZIMAS overlay fields straight from public ArcGIS layers,
+#              so the Playwright scrape only runs for fields no layer covers.
+
+import sys
+import json
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+
+import orjson
+
+import scraper_pdb
+from ain_resolver import resolve_address_to_ain
+from http_client import get_client, close_client
+from zimas_scraper import FIELD_MAP_BY_NAME, scrape_zimas_ultra
+
+# -------------------------------
+# Layer registry
+# -------------------------------
+# field:  output key; a FIELD_MAP name is answered instead of scraping it,
+#         any other name (FEMA's own codes, e.g. "AE"/"X") is an extra key
+# attr:   attribute to report; None means "Yes"/"No" by point-in-polygon
+LAYERS = [
+    {
+        "field": "Liquefaction_Zone",
+        "url": "https://gis.conservation.ca.gov/server/rest/services/CGS_Earthquake_Hazard_Zones/SHP_Liquefaction_Zones/MapServer/0/query",
+        "attr": None,
+    },
+    {
+        "field": "Alquist_Priolo_Fault_Zone",
+        "url": "https://gis.conservation.ca.gov/server/rest/services/CGS_Earthquake_Hazard_Zones/SHP_Fault_Zones/MapServer/0/query",
+        "attr": None,
+    },
+    {
+        "field": "FEMA_Flood_Zone",
+        "url": "https://hazards.fema.gov/gis/nfhl/rest/services/public/NFHL/MapServer/28/query",
+        "attr": "FLD_ZONE",
+    },
+]
+
+LAYER_FIELDS = frozenset(layer["field"] for layer in LAYERS)
+EXTRA_LAYER_FIELDS = [layer["field"] for layer in LAYERS if layer["field"] not in FIELD_MAP_BY_NAME]
+
+
+# -------------------------------
+# 1) One layer, one point
+# -------------------------------
+async def query_layer(layer: Dict[str, Any], lat: float, lon: float) -> Optional[str]:
+    params = {
+        "f": "json",
+        "geometry": f"{lon},{lat}",  # x,y = lon,lat
+        "geometryType": "esriGeometryPoint",
+        "inSR": 4326,
+        "spatialRel": "esriSpatialRelIntersects",
+        "outFields": layer["attr"] or "OBJECTID",
+        "returnGeometry": "false",
+        "resultRecordCount": 1,
+    }
+    r = await get_client().get(layer["url"], params=params)
+    r.raise_for_status()
+    features = orjson.loads(r.content).get("features", [])
+
+    if layer["attr"] is None:
+        return "Yes" if features else "No"
+    if not features:
+        return None
+    return features[0].get("attributes", {}).get(layer["attr"])
+
+
+# -------------------------------
+# 2) All layers for a point
+# -------------------------------
+async def fetch_layer_fields(lat: float, lon: float) -> Dict[str, str]:
+    """
+    Query every registered layer concurrently. Layers that fail or have no
+    answer are left out, so the caller can fall back to ZIMAS for them.
+    """
+    answers = await asyncio.gather(
+        *(query_layer(layer, lat, lon) for layer in LAYERS), return_exceptions=True
+    )
+    return {
+        layer["field"]: value
+        for layer, value in zip(LAYERS, answers)
+        if isinstance(value, str) and value
+    }
+
+
+async def _coords_for_address(house_number: str, street_name: str):
+    ain = await resolve_address_to_ain(house_number, street_name)
+    if not ain:
+        return None
+    try:
+        raw = await scraper_pdb.fetch_parcel_detail(ain)
+    except Exception:  # HTTP failure or a non-JSON body: no coords, ZIMAS decides
+        return None
+    parcel = raw.get("Parcel", {})
+    lat, lon = parcel.get("Latitude"), parcel.get("Longitude")
+    if lat is None or lon is None:
+        return None
+    return lat, lon
+
+
+# -------------------------------
+# 3) Layers first, Playwright for the rest
+# -------------------------------
+async def scrape_zimas_hybrid(
+    house_number: str,
+    street_name: str,
+    fields: Optional[Iterable[str]] = None,
+    **scrape_kwargs,
+) -> Dict:
+    """
+    Same output shape as scrape_zimas_ultra, plus EXTRA_LAYER_FIELDS. Layers
+    are queried first (a few HTTP calls); one scrape then covers whatever they
+    left unanswered, and no browser is launched if that is nothing.
+    """
+    wanted = (
+        list(FIELD_MAP_BY_NAME) + EXTRA_LAYER_FIELDS if fields is None else list(dict.fromkeys(fields))
+    )
+
+    found: Dict[str, str] = {}
+    if LAYER_FIELDS.intersection(wanted):
+        coords = await _coords_for_address(house_number, street_name)
+        if coords:
+            found = await fetch_layer_fields(*coords)
+
+    browser_wanted = [f for f in wanted if f not in found and f in FIELD_MAP_BY_NAME]
+    if not browser_wanted:
+        return {
+            "Overlay_Zones_Data": {k: found.get(k, "Not found") for k in wanted},
+            "_debug": {"house_number": house_number, "street_name_input": street_name, "source": "arcgis"},
+        }
+
+    scraped = await scrape_zimas_ultra(house_number, street_name, fields=browser_wanted, **scrape_kwargs)
+    data = scraped.get("Overlay_Zones_Data")
+    if data is None:
+        return scraped
+
+    data.update(found)
+    scraped["Overlay_Zones_Data"] = {k: data.get(k, "Not found") for k in wanted}
+    return scraped
+
+
+# -------------------------------
+# 4) CLI entrypoint
+# -------------------------------
+async def _hybrid_and_close(house_number: str, street_name: str, fields) -> Dict:
+    try:
+        return await scrape_zimas_hybrid(house_number, street_name, fields=fields)
+    finally:
+        await close_client()
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python zimas_layers.py <house_number> <street_name> [field ...]")
+        print("Example: python zimas_layers.py 1617 Cosmo FEMA_Flood_Zone Liquefaction_Zone")
+        sys.exit(1)
+
+    fields = sys.argv[3:] or None
+    data = asyncio.run(_hybrid_and_close(sys.argv[1], sys.argv[2], fields))
+    print(json.dumps(data, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# zimas_pool.py
+# Description: Keeps one warm Chromium around so ZIMAS scrapes skip the
+#              1-3 s browser cold start.
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from zimas_scraper import launch_browser, new_scrape_context, scrape_zimas_ultra
+
+
+class BrowserPool:
+    """
+    One long-lived Chromium shared by up to `size` concurrent scrape contexts.
+
+    The browser is replaced after `max_pages_per_browser` leases or
+    `max_age_seconds`; the old one is closed once its in-flight scrapes finish.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        headless: bool = True,
+        max_pages_per_browser: int = 50,
+        max_age_seconds: float = 300,
+    ):
+        self.size = size
+        self.headless = headless
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_age_seconds = max_age_seconds
+
+        self._sem = asyncio.Semaphore(size)
+        self._lock = asyncio.Lock()
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._launched_at = 0.0
+        self._uses = 0
+        self._in_flight: Dict[Browser, int] = {}
+
+    async def start(self) -> None:
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def close(self) -> None:
+        async with self._lock:
+            for browser in list(self._in_flight):
+                await browser.close()
+            self._in_flight.clear()
+            self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator[BrowserContext]:
+        """Lease a fresh, isolated context on the shared browser."""
+        async with self._sem:
+            async with self._lock:
+                await self._ensure_browser()
+                browser = self._browser
+                self._uses += 1
+                self._in_flight[browser] += 1
+
+            try:
+                ctx = await new_scrape_context(browser)
+                try:
+                    yield ctx
+                finally:
+                    await ctx.close()
+            finally:
+                async with self._lock:
+                    # close() may already have dropped this browser
+                    if browser in self._in_flight:
+                        self._in_flight[browser] -= 1
+                        await self._retire_if_idle(browser)
+
+    async def scrape(self, house_number: str, street_name: str) -> Dict:
+        async with self.context() as ctx:
+            return await scrape_zimas_ultra(house_number, street_name, context=ctx)
+
+    # ---------- internals (call with self._lock held) ----------
+
+    def _is_stale(self) -> bool:
+        return (
+            self._uses >= self.max_pages_per_browser
+            or time.monotonic() - self._launched_at >= self.max_age_seconds
+        )
+
+    async def _ensure_browser(self) -> None:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        if self._browser is not None and self._browser.is_connected() and not self._is_stale():
+            return
+
+        old = self._browser
+        self._browser = await launch_browser(self._playwright, headless=self.headless)
+        self._launched_at = time.monotonic()
+        self._uses = 0
+        self._in_flight[self._browser] = 0
+        if old is not None:
+            await self._retire_if_idle(old)
+
+    async def _retire_if_idle(self, browser: Browser) -> None:
+        if browser is not self._browser and self._in_flight.get(browser) == 0:
+            del self._in_flight[browser]
+            await browser.close()
@@ -8,30 +8,38 @@ import json
 import re
 import asyncio
 import csv
-from typing import Dict
+from contextlib import AsyncExitStack
+from typing import Dict, Iterable, Optional
 from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
-from playwright.async_api import async_playwright, Page
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 ZIMAS_URL = "https://zimas.lacity.org/"
 
 # ----------------------------------------------------------------------
 # Ultra-Clean Helpers
 # ----------------------------------------------------------------------
+_STREET_SUFFIXES = (" st", " street", " ave", " avenue", " blvd", " boulevard",
+                    " dr", " drive", " rd", " road", " pl", " place", " ln", " lane",
+                    " way", " ct", " court", " cir", " circle", " ter", " terrace")
+
 def clean_street_name(name: str) -> str:
-    suffixes = [" st", " street", " ave", " avenue", " blvd", " boulevard",
-                " dr", " drive", " rd", " road", " pl", " place", " ln", " lane",
-                " way", " ct", " court", " cir", " circle", " ter", " terrace"]
     n = name.lower().strip()
-    for s in suffixes:
-        if n.endswith(s):
-            n = n[: -len(s)]
-            break
+    # One C-level check; the loop only runs to find which suffix matched
+    if n.endswith(_STREET_SUFFIXES):
+        for s in _STREET_SUFFIXES:
+            if n.endswith(s):
+                n = n[: -len(s)]
+                break
     return n.strip().title()
 
+_PUNCT_TABLE = str.maketrans("()/", "   ")
+_NONWORD_RE = re.compile(r"[^0-9a-zA-Z]+")
+
 def _normalize_label(label: str) -> str:
-    return re.sub(r"[^0-9a-zA-Z]+", "_", re.sub(r"[()/]", " ", " ".join(label.split()))).strip("_")
+    return _NONWORD_RE.sub("_", " ".join(label.split()).translate(_PUNCT_TABLE)).strip("_")
 
 # ----------------------------------------------------------------------
 # Tab Intelligence
@@ -44,6 +52,76 @@ SECTIONS = [
     {"tab_text": "Seismic Hazards", "keywords": ["Nearest Fault", "Slip Rate"]},
 ]
 
+# One CDP round trip per table instead of one per cell
+_ROWS_JS = """() => Array.from(document.querySelectorAll('tr')).map(tr => {
+    const c = tr.querySelectorAll('th, td');
+    return c.length >= 2 ? [c[0].innerText.trim(), c[1].innerText.trim()] : null;
+}).filter(Boolean)"""
+
+_BODY_TEXT_JS = "() => document.body ? document.body.innerText : ''"
+
+# ----------------------------------------------------------------------
+# Clean Output: (output field, section id, scraped key); section None = not in ZIMAS
+# ----------------------------------------------------------------------
+NOT_LISTED = "Not listed in ZIMAS"
+
+FIELD_MAP = [
+    ("General_Plan_Land_Use", "Planning_and_Zoning", "General_Plan_Land_Use"),
+    ("Occupancy", None, None),
+    ("Community_Plan_Area", "Jurisdictional", "Community_Plan_Area"),
+    ("Liquefaction_Zone", "Seismic_Hazards", "Liquefaction"),
+    ("Flood_Zone", "Additional", "Flood_Zone"),
+    ("Specific_Plan", "Planning_and_Zoning", "Specific_Plan_Area"),
+    ("High_Quality_Transit_Corridor_within_half_mile", "Planning_and_Zoning", "High_Quality_Transit_Corridor_within_1_2_mile"),
+    ("California_Building_Codes", None, None),
+    ("Alquist_Priolo_Fault_Zone", "Seismic_Hazards", "Alquist_Priolo_Fault_Zone"),
+    ("Hillside_Area_Zoning_Code", "Planning_and_Zoning", "Hillside_Area_Zoning_Code"),
+    ("Special_Land_Use_or_Zoning", "Planning_and_Zoning", "Special_Land_Use_Zoning"),
+    ("Historic_Preservation_Review", "Planning_and_Zoning", "Historic_Preservation_Review"),
+    ("HistoricPlacesLA", "Planning_and_Zoning", "HistoricPlacesLA"),
+    ("CDO_Community_Design_Overlay", "Planning_and_Zoning", "CDO_Community_Design_Overlay"),
+    ("RFA_Residential_Floor_Area_District", "Planning_and_Zoning", "RFA_Residential_Floor_Area_District"),
+    ("Airport_Hazard", "Additional", "Airport_Hazard"),
+    ("Coastal_Zone", "Additional", "Coastal_Zone"),
+    ("Very_High_Fire_Hazard_Severity_Zone", "Additional", "Very_High_Fire_Hazard_Severity_Zone"),
+    ("Special_Grading_Area", "Additional", "Special_Grading_Area_BOE_Basic_Grid_Map_A_13372"),
+    ("Wildland_Urban_Interface_WUI", "Environmental", "Wildland_Urban_Interface_WUI"),
+]
+
+FIELD_MAP_BY_NAME = {out: (sec_id, key) for out, sec_id, key in FIELD_MAP}
+
+# ----------------------------------------------------------------------
+# Browser Setup (shared with zimas_pool)
+# ----------------------------------------------------------------------
+BROWSER_ARGS = [
+    "--disable-gpu", "--no-sandbox", "--disable-setuid-sandbox",  # GPU-friendly
+    "--disable-dev-shm-usage", "--disable-blink-features=AutomationControlled",
+]
+
+async def launch_browser(p: Playwright, headless: bool = True, slow_mo: int = 0) -> Browser:
+    return await p.chromium.launch(headless=headless, slow_mo=slow_mo, args=BROWSER_ARGS)
+
+async def new_scrape_context(browser: Browser) -> BrowserContext:
+    context = await browser.new_context(
+        viewport={"width": 1920, "height": 1080},
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+    )
+    await context.route("**/*", _block_heavy)
+    return context
+
+# ----------------------------------------------------------------------
+# Resource Blocking: none of these bytes feed the scraped fields
+# ----------------------------------------------------------------------
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net")
+
+async def _block_heavy(route: Route):
+    req = route.request
+    if req.resource_type in BLOCKED_RESOURCE_TYPES or any(h in req.url for h in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
 # ----------------------------------------------------------------------
 # Silent Terms Handler
 # ----------------------------------------------------------------------
@@ -66,6 +144,78 @@ async def handle_terms_popup(page: Page):
         if (btn) btn.click();
     }""")
 
+# ----------------------------------------------------------------------
+# Single Tab Scrape
+# ----------------------------------------------------------------------
+async def _wait_for_section_rows(page: Page, keywords, timeout: float = 10.0):
+    """Poll every frame until one has table rows labelled with a section keyword."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        for f in page.frames:
+            try:
+                pairs = await f.evaluate(_ROWS_JS)
+            except: continue
+            if any(k in label.upper() for label, _ in pairs for k in keywords):
+                return pairs
+        await asyncio.sleep(0.1)
+    return None
+
+async def scrape_section(page: Page, sec: Dict) -> Dict[str, str]:
+    tab_text = sec["tab_text"]
+    keywords = [k.upper() for k in sec["keywords"]]
+
+    tab = None
+    candidates = await page.locator(f"button:has-text('{tab_text}'), a:has-text('{tab_text}'), span:has-text('{tab_text}')").all()
+    for c in candidates:
+        if tab_text.lower() in (await c.inner_text()).lower():
+            tab = c
+            break
+    if not tab:
+        tab = page.locator(f"*:has-text('{tab_text}')").first
+
+    if not await tab.is_visible(timeout=5000):
+        return {}
+
+    await tab.click()
+
+    pairs = await _wait_for_section_rows(page, keywords)
+    if pairs is None:
+        frame = page.main_frame
+        for f in page.frames:
+            try:
+                body = await f.evaluate(_BODY_TEXT_JS)
+                if any(k in body.upper() for k in keywords):
+                    frame = f
+                    break
+            except: continue
+        pairs = await frame.evaluate(_ROWS_JS)
+
+    data = {}
+    counts = defaultdict(int)
+    for label, value in pairs:
+        if not label or not value: continue
+        key = _normalize_label(label)
+        counts[key] += 1
+        final_key = f"{key}_{counts[key]}" if counts[key] > 1 else key
+        data[final_key] = value
+    return data
+
+# ----------------------------------------------------------------------
+# CSV Export
+# ----------------------------------------------------------------------
+CSV_OUTPUT_DIR = Path("csv_output")
+
+# Strong refs so pending CSV writes aren't garbage-collected mid-flight
+_background_tasks = set()
+
+def _write_csv(row: Dict, path: Path) -> None:
+    path.parent.mkdir(exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=row.keys())
+        writer.writeheader()
+        writer.writerow(row)
+
 # ----------------------------------------------------------------------
 # Core Engine: GPU-Friendly, Headless-Optimized
 # ----------------------------------------------------------------------
@@ -74,7 +224,17 @@ async def scrape_zimas_ultra(
     street_name: str,
     headless: bool = True,
     slow_mo: int = 0,
+    context: Optional[BrowserContext] = None,
+    export_csv: bool = False,
+    fields: Optional[Iterable[str]] = None,
+    browser: Optional[Browser] = None,
 ) -> Dict:
+    """
+    Pass a pooled `context` (see zimas_pool.BrowserPool) or a long-lived
+    `browser` (e.g. held by st.cache_resource) to skip launching Chromium.
+    With `export_csv`, the clean row is written to csv_output/ in the background.
+    `fields` limits the output (and the tabs visited) to those FIELD_MAP names.
+    """
     result = {
         "Overlay_Zones_Data": {},
         "_debug": {
@@ -84,17 +244,16 @@ async def scrape_zimas_ultra(
         },
     }
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=headless,
-            slow_mo=slow_mo,
-            args=["--disable-gpu", "--no-sandbox", "--disable-setuid-sandbox"]  # GPU-friendly
-        )
-        context = await browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-        )
+    async with AsyncExitStack() as stack:
+        if context is None:
+            if browser is None:
+                p = await stack.enter_async_context(async_playwright())
+                browser = await launch_browser(p, headless=headless, slow_mo=slow_mo)
+                stack.push_async_callback(browser.close)
+            context = await new_scrape_context(browser)
+            stack.push_async_callback(context.close)
         page = await context.new_page()
+        stack.push_async_callback(page.close)
 
         try:
             await page.goto(ZIMAS_URL, wait_until="domcontentloaded", timeout=60000)
@@ -103,85 +262,56 @@ async def scrape_zimas_ultra(
             await page.fill("input[title*='House' i], input[id*='House' i]", house_number.strip())
             await page.fill("input[title*='Street' i], input[id*='Street' i]", clean_street_name(street_name))
             await page.click("#btnSearchGo")
-            await asyncio.sleep(5)
+            try: await page.wait_for_selector("table td a", timeout=15000)
+            except: pass
 
             # Auto-select first result
             try:
                 link = page.locator("table td a").first
                 if await link.is_visible(timeout=3000):
                     await link.click()
-                    await asyncio.sleep(3)
+                    # Detail view is ready once its first tab renders
+                    await page.wait_for_selector(f"text={SECTIONS[0]['tab_text']}", timeout=15000)
             except: pass
 
-            # Intelligent tab scraping
-            for sec in SECTIONS:
-                tab_text = sec["tab_text"]
-                keywords = [k.upper() for k in sec["keywords"]]
-                sec_id = tab_text.replace(" ", "_")
-
-                tab = None
-                candidates = await page.locator(f"button:has-text('{tab_text}'), a:has-text('{tab_text}'), span:has-text('{tab_text}')").all()
-                for c in candidates:
-                    if tab_text.lower() in (await c.inner_text()).lower():
-                        tab = c
-                        break
-                if not tab:
-                    tab = page.locator(f"*:has-text('{tab_text}')").first
-
-                if not await tab.is_visible(timeout=5000):
-                    result["Overlay_Zones_Data"][sec_id] = {}
-                    continue
-
-                await tab.click()
-                await asyncio.sleep(2)
-
-                frame = page.main_frame
-                for f in page.frames:
+            # Only visit tabs that feed a requested field
+            wanted = set(FIELD_MAP_BY_NAME) if fields is None else set(fields) & FIELD_MAP_BY_NAME.keys()
+            needed = {FIELD_MAP_BY_NAME[out][0] for out in wanted}
+            sections = [sec for sec in SECTIONS if sec["tab_text"].replace(" ", "_") in needed]
+
+            # Intelligent tab scraping: one page per tab when the parcel is URL-addressable
+            detail_url = page.url
+            if sections and detail_url.rstrip("/") != ZIMAS_URL.rstrip("/"):
+                async def scrape_on_new_page(sec: Dict) -> Dict[str, str]:
+                    tab_page = await context.new_page()
                     try:
-                        body = await f.locator("body").inner_text(timeout=2000)
-                        if any(k in body.upper() for k in keywords):
-                            frame = f
-                            break
-                    except: continue
-
-                data = {}
-                counts = defaultdict(int)
-                rows = await frame.locator("tr").all()
-                for row in rows:
-                    cells = await row.locator("th, td").all()
-                    if len(cells) < 2: continue
-                    label = (await cells[0].inner_text()).strip()
-                    value = (await cells[1].inner_text()).strip()
-                    if not label or not value: continue
-                    key = _normalize_label(label)
-                    counts[key] += 1
-                    final_key = f"{key}_{counts[key]}" if counts[key] > 1 else key
-                    data[final_key] = value
-
-                result["Overlay_Zones_Data"][sec_id] = data
+                        await tab_page.goto(detail_url, wait_until="domcontentloaded", timeout=60000)
+                        await handle_terms_popup(tab_page)
+                        # scrape_section doesn't wait; let this page render its tab first
+                        try:
+                            await tab_page.wait_for_selector(f"text={sec['tab_text']}", timeout=15000)
+                        except PlaywrightTimeoutError as e:
+                            raise RuntimeError(f"{sec['tab_text']} tab did not render on {detail_url}") from e
+                        return await scrape_section(tab_page, sec)
+                    finally:
+                        await tab_page.close()
+
+                sections_data = await asyncio.gather(
+                    scrape_section(page, sections[0]),
+                    *(scrape_on_new_page(sec) for sec in sections[1:]),
+                )
+            else:
+                sections_data = [await scrape_section(page, sec) for sec in sections]
+
+            for sec, data in zip(sections, sections_data):
+                result["Overlay_Zones_Data"][sec["tab_text"].replace(" ", "_")] = data
 
             # === ULTRA CLEAN OUTPUT ===
+            scraped = result["Overlay_Zones_Data"]
             clean_data = {
-                "General_Plan_Land_Use": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("General_Plan_Land_Use", "Not found"),
-                "Occupancy": "Not listed in ZIMAS",
-                "Community_Plan_Area": result["Overlay_Zones_Data"].get("Jurisdictional", {}).get("Community_Plan_Area", "Not found"),
-                "Liquefaction_Zone": result["Overlay_Zones_Data"].get("Seismic_Hazards", {}).get("Liquefaction", "Not found"),
-                "Flood_Zone": result["Overlay_Zones_Data"].get("Additional", {}).get("Flood_Zone", "Not found"),
-                "Specific_Plan": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("Specific_Plan_Area", "Not found"),
-                "High_Quality_Transit_Corridor_within_half_mile": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("High_Quality_Transit_Corridor_within_1_2_mile", "Not found"),
-                "California_Building_Codes": "Not listed in ZIMAS",
-                "Alquist_Priolo_Fault_Zone": result["Overlay_Zones_Data"].get("Seismic_Hazards", {}).get("Alquist_Priolo_Fault_Zone", "Not found"),
-                "Hillside_Area_Zoning_Code": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("Hillside_Area_Zoning_Code", "Not found"),
-                "Special_Land_Use_or_Zoning": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("Special_Land_Use_Zoning", "Not found"),
-                "Historic_Preservation_Review": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("Historic_Preservation_Review", "Not found"),
-                "HistoricPlacesLA": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("HistoricPlacesLA", "Not found"),
-                "CDO_Community_Design_Overlay": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("CDO_Community_Design_Overlay", "Not found"),
-                "RFA_Residential_Floor_Area_District": result["Overlay_Zones_Data"].get("Planning_and_Zoning", {}).get("RFA_Residential_Floor_Area_District", "Not found"),
-                "Airport_Hazard": result["Overlay_Zones_Data"].get("Additional", {}).get("Airport_Hazard", "Not found"),
-                "Coastal_Zone": result["Overlay_Zones_Data"].get("Additional", {}).get("Coastal_Zone", "Not found"),
-                "Very_High_Fire_Hazard_Severity_Zone": result["Overlay_Zones_Data"].get("Additional", {}).get("Very_High_Fire_Hazard_Severity_Zone", "Not found"),
-                "Special_Grading_Area": result["Overlay_Zones_Data"].get("Additional", {}).get("Special_Grading_Area_BOE_Basic_Grid_Map_A_13372", "Not found"),
-                "Wildland_Urban_Interface_WUI": result["Overlay_Zones_Data"].get("Environmental", {}).get("Wildland_Urban_Interface_WUI", "Not found"),
+                out: NOT_LISTED if sec_id is None else scraped.get(sec_id, {}).get(key, "Not found")
+                for out, sec_id, key in FIELD_MAP
+                if out in wanted
             }
 
             final_result = {
@@ -189,23 +319,20 @@ async def scrape_zimas_ultra(
                 "_debug": result["_debug"]
             }
 
-            # === AUTO CSV EXPORT ===
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"zimas_{house_number}_{clean_street_name(street_name)}_{timestamp}.csv"
-            Path("csv_output").mkdir(exist_ok=True)
-            csv_path = Path("csv_output") / filename
+            # === CSV EXPORT (off the event loop) ===
+            if export_csv:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"zimas_{house_number}_{clean_street_name(street_name)}_{timestamp}.csv"
+                csv_path = CSV_OUTPUT_DIR / filename
 
-            row = {"House_Number": house_number, "Street_Name": street_name, **clean_data}
-            with open(csv_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=row.keys())
-                writer.writeheader()
-                writer.writerow(row)
+                row = {"House_Number": house_number, "Street_Name": street_name, **clean_data}
+                task = asyncio.create_task(asyncio.to_thread(_write_csv, row, csv_path))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
 
-            await browser.close()
             return final_result
 
         except Exception as e:
-            await browser.close()
             return {"_error": str(e), "_debug": result["_debug"]}
 
 # ----------------------------------------------------------------------
@@ -218,6 +345,7 @@ if __name__ == "__main__":
     parser.add_argument("street_name", help="Street name (e.g., Cosmo)")
     parser.add_argument("--visible", action="store_true", help="Run in visible mode")
     parser.add_argument("--slow", type=int, default=0, help="Slow motion delay")
+    parser.add_argument("--no-csv", action="store_true", help="Skip the csv_output/ export")
     args = parser.parse_args()
 
     data = asyncio.run(scrape_zimas_ultra(
@@ -225,5 +353,6 @@ if __name__ == "__main__":
         args.street_name,
         headless=not args.visible,
         slow_mo=args.slow,
+        export_csv=not args.no_csv,
     ))
     print(json.dumps(data, indent=2))
@@ -1,10 +1,27 @@
-import json
-from typing import List
+import asyncio
+import concurrent.futures
+import os
+import re
+from typing import Iterator, List, Optional, Tuple
 
-import pandas as pd
-import requests
+import orjson
 import streamlit as st
-from main import get_combined, combo_batch, BatchRequest
+
+from background_loop import get_loop
+
+# "local" runs the FastAPI handlers in-process; "http" calls the API service
+MODE = os.environ.get("LAROCI_MODE", "local")
+
+# FastAPI container base URL (http mode)
+API_BASE = os.environ.get("LAROCI_API_BASE", "http://localhost:8000")
+
+# Concurrent /combo/{ain} calls per batch (http mode)
+BATCH_CONCURRENCY = 10
+
+# Read timeouts (s) for single / per-item batch calls; connects fail fast
+CONNECT_TIMEOUT = 3.05
+LIVE_TIMEOUT = float(os.environ.get("LAROCI_LIVE_TIMEOUT", "12"))
+BATCH_TIMEOUT = float(os.environ.get("LAROCI_BATCH_TIMEOUT", "8"))
 
 
 # ============== PAGE CONFIG ==============
@@ -19,22 +36,200 @@ st.caption("Powered by your Dockerized FastAPI API (Assessor PDB + Z-NET zoning)
 st.markdown("---")
 
 
+# ============== BACKENDS ==============
+
+class BackendError(RuntimeError):
+    """A backend failure with a message that is ready to show the user."""
+
+
+def _run(coro, timeout: Optional[float] = None):
+    """Run a coroutine on the background loop and wait for its result."""
+    fut = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return fut.result(timeout=timeout)
+    except concurrent.futures.TimeoutError as e:
+        fut.cancel()
+        raise BackendError(f"Timed out after {timeout:g}s") from e
+
+
+# ---------- local: same combo logic, no HTTP ----------
+# The shared httpx pool (http_client) lives on the background loop, so
+# keep-alive connections survive across lookups.
+
+def _local_combo_single(ain: str) -> dict:
+    from main import get_combined
+
+    return _run(get_combined(ain), timeout=LIVE_TIMEOUT)
+
+
+async def _local_combo_one(ain: str) -> dict:
+    """Batch item; failures come back as an error row like /combo/batch."""
+    from main import get_combined
+
+    try:
+        return await asyncio.wait_for(get_combined(ain), BATCH_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"ain": ain, "parcel": None, "zoning": None, "error": f"Timed out after {BATCH_TIMEOUT:g}s"}
+    except Exception as e:
+        return {"ain": ain, "parcel": None, "zoning": None, "error": str(e)}
+
+
+# ---------- http: call the FastAPI service ----------
+
+@st.cache_resource
+def _http():
+    """One pooled Session per server process: keep-alive + light retries."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        # 502 is the API relaying an Assessor error (e.g. unknown AIN): not retryable.
+        # read=0 keeps LIVE_TIMEOUT the real bound on a stalled request.
+        max_retries=Retry(
+            total=2, read=0, backoff_factor=0.2,
+            status_forcelist=[503, 504], raise_on_status=False,
+        ),
+    )
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def _http_combo_single(ain: str) -> dict:
+    import requests
+
+    url = f"{API_BASE}/combo/{ain}"
+    try:
+        r = _http().get(url, timeout=(CONNECT_TIMEOUT, LIVE_TIMEOUT))
+        r.raise_for_status()
+    except requests.HTTPError as e:
+        raise BackendError(f"HTTP error from zoning API: {e}") from e
+    except requests.RequestException as e:
+        raise BackendError(f"Network error calling zoning API: {e}") from e
+    return r.json()
+
+
+@st.cache_resource
+def _async_http():
+    """Pooled async client for batch items; only ever used on the background loop."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    timeout = httpx.Timeout(BATCH_TIMEOUT, connect=CONNECT_TIMEOUT)
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+async def _fetch_one(ain: str, client) -> dict:
+    """GET /combo/{ain}; failures come back as an error row like /combo/batch."""
+    import httpx
+
+    try:
+        r = await client.get(f"{API_BASE}/combo/{ain}")
+        r.raise_for_status()
+        return r.json()
+    except httpx.HTTPError as e:
+        return {"ain": ain, "parcel": None, "zoning": None, "error": str(e)}
+
+
+def _http_combo_one(ain: str):
+    # Grab the cached client here, on the script thread
+    return _fetch_one(ain, _async_http())
+
+
+if MODE == "http":
+    _combo_single, _combo_one = _http_combo_single, _http_combo_one
+else:
+    _combo_single, _combo_one = _local_combo_single, _local_combo_one
+
+
 # ============== HELPERS ==============
 
+# Cached per AIN so full-script reruns don't refetch
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_combo_single(ain: str) -> dict:
+    return _combo_single(ain)
+
+
+_AIN_SEP = re.compile(r"[\s,;]+")
+_NON_DIGIT = re.compile(r"\D+")
+
+
+def normalize_ain(ain: str) -> str:
+    """AINs are digits only; drop dashes/spaces so cache keys line up."""
+    return _NON_DIGIT.sub("", ain)
+
+
+def split_ains(text: str) -> List[str]:
+    """Split pasted AINs on whitespace, commas or semicolons."""
+    return [a for a in map(normalize_ain, _AIN_SEP.split(text)) if a]
+
+
 def call_combo_single(ain: str) -> dict:
-    """Run the same combo logic directly (no HTTP)."""
-    ain = ain.strip()
-    return get_combined(ain)
+    """Fetch parcel + zoning for one normalized AIN via the configured backend."""
+    return _cached_combo_single(ain)
+
+
+def iter_combo_batch(ains: List[str]) -> Iterator[Tuple[int, dict]]:
+    """
+    Yield (index, result) for each AIN as soon as it completes, with at most
+    BATCH_CONCURRENCY in flight on the background loop.
+    """
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def bounded(coro):
+        async with sem:
+            return await coro
+
+    futures = {
+        asyncio.run_coroutine_threadsafe(bounded(_combo_one(a)), get_loop()): i
+        for i, a in enumerate(ains)
+    }
+    try:
+        for fut in concurrent.futures.as_completed(futures):
+            yield futures[fut], fut.result()
+    finally:
+        for fut in futures:
+            fut.cancel()
+
+
+def _pretty(obj) -> str:
+    """Indented JSON for the raw panel (orjson: much faster than json.dumps)."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
 
 
-def call_combo_batch(ains: List[str]) -> dict:
-    """Run batch combo logic directly (no HTTP)."""
-    clean = [a.strip() for a in ains if a.strip()]
-    request = BatchRequest(ains=clean)
-    return combo_batch(request)
+def _coerce_coords(zoning: dict, parcel: dict) -> Optional[Tuple[float, float]]:
+    """(lat, lon) as floats from the zoning or parcel block, else None."""
+    lat = zoning.get("latitude") or parcel.get("latitude")
+    lon = zoning.get("longitude") or parcel.get("longitude")
+    if not (lat and lon):
+        return None
+    try:
+        return float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+
+
+@st.cache_data(show_spinner=False)
+def _map_df(lat: float, lon: float):
+    """One-point frame for st.map, memoized per coordinate across reruns."""
+    import pandas as pd
+
+    # Map wants 'lat'/'lon' columns
+    return pd.DataFrame({"lat": [lat], "lon": [lon]})
+
 
+@st.fragment
+def _raw_panel(res: dict, key: str) -> None:
+    """Raw JSON toggle; as a fragment, clicking it reruns only this panel."""
+    if st.checkbox("Show raw JSON", key=key):
+        st.code(_pretty(res), language="json")
 
-def render_single_result(res: dict, show_raw: bool = False) -> None:
+
+def render_single_result(res: dict, raw_key: str = "raw_single") -> None:
     """Pretty UI for one combined parcel+zoning result."""
     parcel = res.get("parcel") or {}
     zoning = res.get("zoning") or {}
@@ -47,7 +242,7 @@ def render_single_result(res: dict, show_raw: bool = False) -> None:
     with col_left:
         st.markdown("### 🧱 Parcel / PDB Summary")
 
-        st.write(parcel.get("situs_address", ""))
+        st.write(parcel.get("situs_address") or "")
 
         st.write(f"**Use type:** {parcel.get('use_type')}")
         st.write(f"**Assessor zoning (PDB):** `{parcel.get('zoning')}`")
@@ -68,6 +263,8 @@ def render_single_result(res: dict, show_raw: bool = False) -> None:
         dtypes = parcel.get("subparts_design_types") or []
         if dtypes:
             st.markdown("**Subpart design types:**")
+            import pandas as pd  # deferred: only parcels with subparts need it
+
             st.table(pd.DataFrame(dtypes))
 
     # --------- RIGHT: Zoning + Map ---------
@@ -79,15 +276,11 @@ def render_single_result(res: dict, show_raw: bool = False) -> None:
         st.write(f"**Zone category:** {zoning.get('znet_zone_category')}")
         st.write(f"**Use type:** {zoning.get('use_type')}")
 
-        lat = zoning.get("latitude") or parcel.get("latitude")
-        lon = zoning.get("longitude") or parcel.get("longitude")
+        coords = _coerce_coords(zoning, parcel)
+        if coords:
+            st.write(f"**Lat / Lon:** {coords[0]}, {coords[1]}")
 
-        if lat is not None and lon is not None:
-            st.write(f"**Lat / Lon:** {lat}, {lon}")
-
-            # Map wants 'lat'/'lon' columns
-            df_map = pd.DataFrame([{"lat": float(lat), "lon": float(lon)}])
-            st.map(df_map, latitude="lat", longitude="lon", zoom=16, use_container_width=True)
+            st.map(_map_df(*coords), latitude="lat", longitude="lon", zoom=16, use_container_width=True)
         else:
             st.info("No latitude/longitude available for this parcel.")
 
@@ -99,9 +292,16 @@ def render_single_result(res: dict, show_raw: bool = False) -> None:
             )
 
     # --------- Raw JSON (optional) ---------
-    if show_raw:
-        st.markdown("#### Raw JSON")
-        st.code(json.dumps(res, indent=2), language="json")
+    _raw_panel(res, raw_key)
+
+
+def render_batch_row(res: dict, index: int) -> None:
+    """One batch entry: an error line or a full result card."""
+    if res.get("error"):
+        st.error(f"AIN {res.get('ain')}: {res['error']}")
+    else:
+        render_single_result(res, raw_key=f"raw_batch_{index}")
+        st.markdown("---")
 
 
 # ============== UI LAYOUT ==============
@@ -125,7 +325,6 @@ with col_main:
         )
 
 with col_side:
-    show_raw_json = st.checkbox("Show raw JSON", value=False)
     run_btn = st.button("Fetch zoning data", type="primary")
 
 
@@ -133,40 +332,61 @@ st.markdown("---")
 
 # ============== ACTION HANDLER ==============
 
+# Results are kept in session_state, so widget reruns re-render the
+# last fetch instead of refetching.
+streamed = False
 if run_btn:
     try:
         if mode == "Single AIN":
-            if not ain_input.strip():
+            ain = normalize_ain(ain_input)
+            if not ain:
                 st.error("Please enter an AIN.")
             else:
-                with st.spinner("Fetching zoning data..."):
-                    data = call_combo_single(ain_input)
-                render_single_result(data, show_raw=show_raw_json)
+                key = (mode, ain)
+                if st.session_state.get("last_key") != key:
+                    st.session_state.pop("last_key", None)
+                    with st.spinner("Fetching zoning data..."):
+                        data = call_combo_single(ain)
+                    st.session_state["last_key"] = key
+                    st.session_state["last_result"] = [data]
 
         else:
-            if not ain_text.strip():
+            tokens = split_ains(ain_text)
+            if not tokens:
                 st.error("Please enter at least one AIN.")
             else:
-                # split on newline or comma
-                tokens: List[str] = []
-                for line in ain_text.replace(",", "\n").splitlines():
-                    line = line.strip()
-                    if line:
-                        tokens.append(line)
-
-                with st.spinner("Fetching batch zoning data..."):
-                    batch = call_combo_batch(tokens)
-
-                results = batch.get("results") or []
-                if not results:
-                    st.warning("No results returned.")
-                else:
-                    for res in results:
-                        if res.get("error"):
-                            st.error(f"AIN {res.get('ain')}: {res['error']}")
-                        else:
-                            render_single_result(res, show_raw=show_raw_json)
-                            st.markdown("---")
-
+                key = (mode, tuple(tokens))
+                if st.session_state.get("last_key") != key:
+                    st.session_state.pop("last_key", None)
+                    # Render each card as it lands, in input order
+                    status = st.status("Fetching batch zoning data...")
+                    slots = [st.container() for _ in tokens]
+                    results: List[dict] = [{}] * len(tokens)
+                    for done, (i, res) in enumerate(iter_combo_batch(tokens), 1):
+                        results[i] = res
+                        with slots[i]:
+                            render_batch_row(res, i)
+                        status.update(label=f"Fetched {done}/{len(tokens)} AINs")
+                    status.update(state="complete")
+                    st.session_state["last_key"] = key
+                    st.session_state["last_result"] = results
+                    streamed = True
+
+    except BackendError as e:
+        st.error(str(e))
     except Exception as e:
         st.error(f"Unexpected error: {e}")
+
+
+# ============== RESULTS ==============
+
+last_key = st.session_state.get("last_key")
+if last_key and last_key[0] == mode and not streamed:
+    results = st.session_state["last_result"]
+    if mode == "Single AIN":
+        render_single_result(results[0])
+    elif not results:
+        st.warning("No results returned.")
+    else:
+        for i, res in enumerate(results):
+            render_batch_row(res, i)